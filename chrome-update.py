@@ -3,21 +3,133 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
+import json
 import os
 import re
 import subprocess
 import sys
-import urllib
+import threading
+import time
+import urllib2
 
 IS_WIN = sys.platform.startswith('win')
 BASE_URL = 'http://src.chromium.org/svn/trunk/tools/buildbot/scripts/'
 COMPILE_URL = BASE_URL + 'slave/compile.py'
 UTILS_URL = BASE_URL + 'common/chromium_utils.py'
 
+# Holds files that don't belong in the chrome checkout (LATEST/REVISION).
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         '.chrome_update_cache')
+
+# Freshness windows, in seconds, used with Cache.get().
+SCRIPT_MAX_AGE = 24 * 60 * 60
+SCRIPT_SWR = 30 * 24 * 60 * 60
+REVISION_MAX_AGE = 60
+REVISION_SWR = 10 * 60
+
+# Network timeout, in seconds, for each download.
+FETCH_TIMEOUT = 30
+
+
+class Cache(object):
+  """Conditional-GET file cache with stale-while-revalidate semantics.
+
+  The validators (ETag and Last-Modified) of each cached file are kept in a
+  '<filename>.meta.json' sidecar and sent back on revalidation, so an
+  unchanged file costs a single 304 round-trip.
+  """
+
+  def __init__(self):
+    self._deferred = []
+
+  def get(self, url, filename, max_age, swr, background=True):
+    """Returns |filename|, downloading |url| into it if needed.
+
+    A file younger than |max_age| is returned as is. A file younger than
+    |max_age| + |swr| is returned immediately and revalidated on a background
+    thread or, if |background| is False, queued for revalidate_deferred().
+    Anything else blocks on the network, falling back to the stale copy (if
+    any) when the download fails.
+    """
+    try:
+      age = time.time() - os.path.getmtime(filename)
+    except OSError:
+      age = None
+    if age is not None and age < max_age:
+      return filename
+    if age is not None and age < max_age + swr:
+      if background:
+        thread = threading.Thread(target=self._revalidate_quietly,
+                                  args=(url, filename))
+        thread.daemon = True
+        thread.start()
+      else:
+        self._deferred.append((url, filename))
+      return filename
+    try:
+      self._revalidate(url, filename)
+    except (urllib2.URLError, IOError):
+      if age is None:
+        raise
+    return filename
+
+  def revalidate_deferred(self):
+    """Revalidates the files queued by get(..., background=False)."""
+    while self._deferred:
+      self._revalidate_quietly(*self._deferred.pop(0))
+
+  @staticmethod
+  def _load_meta(filename):
+    try:
+      with open(filename + '.meta.json') as f:
+        return json.load(f)
+    except (IOError, ValueError):
+      return {}
+
+  def _revalidate_quietly(self, url, filename):
+    # A stale copy is already in use, so a failed refresh is not an error.
+    try:
+      self._revalidate(url, filename)
+    except (urllib2.URLError, IOError):
+      pass
+
+  def _revalidate(self, url, filename):
+    request = urllib2.Request(url)
+    meta = self._load_meta(filename) if os.path.exists(filename) else {}
+    if meta.get('etag'):
+      request.add_header('If-None-Match', meta['etag'])
+    if meta.get('last_modified'):
+      request.add_header('If-Modified-Since', meta['last_modified'])
+    try:
+      response = urllib2.urlopen(request, timeout=FETCH_TIMEOUT)
+    except urllib2.HTTPError as e:
+      if e.code != 304:
+        raise
+      # Not modified; restart the freshness window.
+      os.utime(filename, None)
+      return
+    data = response.read()
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+      f.write(data)
+    # os.rename() atomically replaces an existing file, except on Windows.
+    if IS_WIN and os.path.exists(filename):
+      os.remove(filename)
+    os.rename(tmp, filename)
+    with open(filename + '.meta.json', 'w') as f:
+      json.dump({
+          'etag': response.info().getheader('ETag'),
+          'last_modified': response.info().getheader('Last-Modified'),
+      }, f)
+
+
+CACHE = Cache()
+
 
 def Fetch(url, filename):
-  if not os.path.exists(filename):
-    urllib.urlretrieve(url, filename)
+  """Fetches a script that is about to run. A stale copy is used as is and only
+  refreshed by CACHE.revalidate_deferred(), once it is no longer running."""
+  return CACHE.get(url, filename, SCRIPT_MAX_AGE, SCRIPT_SWR, background=False)
 
 
 def GetLastestRevision():
@@ -34,7 +146,15 @@ def GetLastestRevision():
     # This path is actually win.
     pass
   url += 'LATEST/REVISION'
-  text = urllib.urlopen(url).read()
+  try:
+    if not os.path.isdir(CACHE_DIR):
+      os.makedirs(CACHE_DIR)
+    filename = CACHE.get(url, os.path.join(CACHE_DIR, 'LATEST_REVISION'),
+                         REVISION_MAX_AGE, REVISION_SWR)
+    with open(filename) as f:
+      text = f.read()
+  except (urllib2.URLError, IOError, OSError):
+    return None
   if text:
     match = re.search(r"(\d+)", text)
     if match:
@@ -57,7 +177,9 @@ def DoBuild(chrome_root, args):
   Fetch(COMPILE_URL, compile_path)
   Fetch(UTILS_URL, os.path.join(chrome_root, 'chromium_utils.py'))
   cmd = ['python', compile_path] + args
-  return subprocess.call(cmd, cwd=chrome_root, shell=IS_WIN)
+  rv = subprocess.call(cmd, cwd=chrome_root, shell=IS_WIN)
+  CACHE.revalidate_deferred()
+  return rv
 
 
 def main(args):
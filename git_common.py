@@ -42,6 +42,10 @@ FREEZE_SECTIONS = {
 }
 FREEZE_MATCHER = re.compile(r'%s.(%s)' % (FREEZE, '|'.join(FREEZE_SECTIONS)))
 
+# Serializes `git config` writes, which fail if another writer holds
+# .git/config.lock (e.g. get_or_create_merge_base called from a thread pool).
+CONFIG_WRITE_LOCK = threading.Lock()
+
 
 # Retry a git operation if git returns a error response with any of these
 # messages. It's all observed 'bad' GoB responses so far.
@@ -295,6 +299,18 @@ def branch_config_map(option):
 def branches(*args):
   NO_BRANCH = ('* (no branch', '* (detached from ')
 
+  raw_branches = run('branch', *args).splitlines()
+
+  check_branch_limit(len(raw_branches))
+
+  for line in raw_branches:
+    if line.startswith(NO_BRANCH):
+      continue
+    yield line.split()[-1]
+
+
+def check_branch_limit(num):
+  """Exits if |num| branches exceeds the user's depot-tools.branch-limit."""
   key = 'depot-tools.branch-limit'
   limit = 20
   try:
@@ -302,9 +318,6 @@ def branches(*args):
   except ValueError:
     pass
 
-  raw_branches = run('branch', *args).splitlines()
-
-  num = len(raw_branches)
   if num > limit:
     print >> sys.stderr, textwrap.dedent("""\
     Your git repo has too many branches (%d/%d) for this tool to work well.
@@ -314,11 +327,6 @@ def branches(*args):
     """ % (num, limit, key))
     sys.exit(1)
 
-  for line in raw_branches:
-    if line.startswith(NO_BRANCH):
-      continue
-    yield line.split()[-1]
-
 
 def config(option, default=None):
   try:
@@ -347,7 +355,8 @@ def del_branch_config(branch, option, scope='local'):
 
 def del_config(option, scope='local'):
   try:
-    run('config', '--' + scope, '--unset', option)
+    with CONFIG_WRITE_LOCK:
+      run('config', '--' + scope, '--unset', option)
   except subprocess2.CalledProcessError:
     pass
 
@@ -599,7 +608,8 @@ def set_branch_config(branch, option, value, scope='local'):
 
 
 def set_config(option, value, scope='local'):
-  run('config', '--' + scope, option, value)
+  with CONFIG_WRITE_LOCK:
+    run('config', '--' + scope, option, value)
 
 
 def squash_current_branch(header=None, merge_base=None):
@@ -14,12 +14,14 @@ commits with branches + tags that point to them. Items are colorized as follows:
   * Blue background - The currently checked out commit
 """
 
+import re
 import sys
 
 import subprocess2
 
-from git_common import current_branch, branches, tags, config_list, GIT_EXE
-from git_common import get_or_create_merge_base, root
+from git_common import current_branch, config_list, GIT_EXE
+from git_common import get_or_create_merge_base, root, run, ScopedPool
+from git_common import check_branch_limit
 
 from third_party import colorama
 
@@ -34,9 +36,31 @@ BLUEBAK = colorama.Back.BLUE
 BRIGHT = colorama.Style.BRIGHT
 RESET = colorama.Fore.RESET + colorama.Back.RESET + colorama.Style.RESET_ALL
 
+# Precomposed color prefixes used per ref in main().
+CYAN_BRIGHT = CYAN + BRIGHT
+GREEN_BRIGHT = GREEN + BRIGHT
+MAGENTA_BRIGHT = MAGENTA + BRIGHT
+BRIGHT_WHITE = BRIGHT + WHITE
+GREEN_SEP = GREEN + ', '
+HEAD_MARKER = BLUEBAK + BRIGHT + '*'
+
 # Git emits combined color
 BRIGHT_RED = '\x1b[1;31m'
 
+# Matches a commit line produced by the format in main(), capturing the
+# abbreviated commit hash.
+LINE_RE = re.compile(r'.*?%s(?P<sha>[0-9a-f]+)\t' % re.escape(BRIGHT_RED))
+
+# Finds the decoration (ref list) following the hash on a commit line.
+DECORATION_RE = re.compile(r'%s \((?P<branches>[^)]*)\)' % re.escape(GREEN))
+
+# Merge bases are indexed by this many leading hex digits, which is the
+# shortest abbreviation git will emit for %h (core.abbrev minimum).
+SHA_PREFIX_LEN = 4
+
+# Output is accumulated and written in chunks of (at least) this many bytes.
+WRITE_CHUNK_SIZE = 64 * 1024
+
 def main(argv):
   map_extra = config_list('depot_tools.map_extra')
   fmt = '%C(red bold)%h%x09%Creset%C(green)%d%Creset %C(yellow)%ad%Creset ~ %s'
@@ -47,34 +71,87 @@ def main(argv):
     stdout=subprocess2.PIPE,
     shell=False)
 
-  current = current_branch()
-  all_branches = set(branches())
-  merge_base_map = {b: get_or_create_merge_base(b) for b in all_branches}
-  merge_base_map = {b: v for b, v in merge_base_map.iteritems() if v}
+  # Gather branch metadata concurrently while `git log` fills its pipe.
+  with ScopedPool(8, kind='threads') as pool:
+    current_async = pool.apply_async(current_branch)
+    # A single for-each-ref yields branches, tags and upstreams, replacing
+    # `git branch`, `git tag` and a `git rev-parse` per branch.
+    all_branches, all_tags, all_refs, upstreams = set(), set(), set(), {}
+    for line in run('for-each-ref',
+                    '--format=%(refname) %(upstream) %(upstream:short)',
+                    'refs/heads', 'refs/tags', 'refs/remotes',
+                    autostrip=False).splitlines():
+      ref, parent_ref, parent = line.split(' ')
+      all_refs.add(ref)
+      if ref.startswith('refs/heads/'):
+        branch = ref[len('refs/heads/'):]
+        all_branches.add(branch)
+        if parent:
+          upstreams[branch] = (parent_ref, parent)
+      elif ref.startswith('refs/tags/'):
+        all_tags.add(ref[len('refs/tags/'):])
+    check_branch_limit(len(all_branches))
+    # An upstream whose ref is gone (e.g. a pruned remote branch) is treated
+    # like no upstream at all, as upstream() would.
+    upstreams = {b: parent for b, (parent_ref, parent) in upstreams.items()
+                 if parent_ref in all_refs}
+    tracked = list(upstreams)
+    merge_bases = pool.map(
+        lambda b: get_or_create_merge_base(b, upstreams[b]), tracked)
+    current = current_async.get()
+  merge_base_map = {b: v for b, v in zip(tracked, merge_bases) if v}
   if current in all_branches:
     all_branches.remove(current)
-  all_tags = set(tags())
+  # {sha prefix: [(branch, merge base sha)]}, so each commit line costs a single
+  # dict lookup instead of a scan over every branch.
+  sha_index = {}
+  for branch, sha in merge_base_map.items():
+    sha_index.setdefault(sha[:SHA_PREFIX_LEN], []).append((branch, sha))
+  line_match = LINE_RE.match
+  decoration_search = DECORATION_RE.search
+  reset, green = RESET, GREEN
+  stdout = log_proc.stdout
+  write = sys.stdout.write
+  # Don't hold back lines from an interactive terminal.
+  chunk_size = 1 if sys.stdout.isatty() else WRITE_CHUNK_SIZE
+  buf = bytearray()
   try:
-    for line in log_proc.stdout.xreadlines():
-      if merge_base_map:
-        commit = line[line.find(BRIGHT_RED)+len(BRIGHT_RED):line.find('\t')]
-        base_for_branches = set()
-        for branch, sha in merge_base_map.iteritems():
-          if sha.startswith(commit):
-            base_for_branches.add(branch)
+    for line in stdout:
+      m = line_match(line)
+      if not m:
+        buf += line
+        if len(buf) >= chunk_size:
+          write(buf)
+          del buf[:]
+        continue
+      # Most lines carry no refs; only look for a decoration if one could be
+      # there. This must happen before the merge-base marker is appended.
+      start = -1
+      if '(' in line:
+        d = decoration_search(line, m.end())
+        if d:
+          start, end = d.span('branches')
+
+      if sha_index:
+        commit = m.group('sha')
+        key = commit[:SHA_PREFIX_LEN]
+        candidates = sha_index.get(key, ())
+        base_for_branches = set(
+            b for b, sha in candidates if sha.startswith(commit))
         if base_for_branches:
           newline = '\r\n' if line.endswith('\r\n') else '\n'
           line = line.rstrip(newline)
           line += ''.join(
-              (BRIGHT, WHITE, '    <(%s)' % (', '.join(base_for_branches)),
-               RESET, newline))
-          for b in base_for_branches:
-            del merge_base_map[b]
-
-      start = line.find(GREEN+' (')
-      end   = line.find(')', start)
-      if start != -1 and end != -1:
-        start += len(GREEN) + 2
+              (BRIGHT_WHITE, '    <(%s)' % (', '.join(base_for_branches)),
+               reset, newline))
+          remaining = [(b, sha) for b, sha in candidates
+                       if b not in base_for_branches]
+          if remaining:
+            sha_index[key] = remaining
+          else:
+            del sha_index[key]
+
+      if start != -1:
         branch_list = line[start:end].split(', ')
         branches_str = ''
         if branch_list:
@@ -82,28 +159,36 @@ def main(argv):
           head_marker = ''
           for b in branch_list:
             if b == "HEAD":
-              head_marker = BLUEBAK+BRIGHT+'*'
+              head_marker = HEAD_MARKER
               continue
             if b == current:
-              colored_branches.append(CYAN+BRIGHT+b+RESET)
+              colored_branches.append(CYAN_BRIGHT + b + reset)
               current = None
             elif b in all_branches:
-              colored_branches.append(GREEN+BRIGHT+b+RESET)
+              colored_branches.append(GREEN_BRIGHT + b + reset)
               all_branches.remove(b)
             elif b in all_tags:
-              colored_branches.append(MAGENTA+BRIGHT+b+RESET)
+              colored_branches.append(MAGENTA_BRIGHT + b + reset)
             elif b.startswith('tag: '):
-              colored_branches.append(MAGENTA+BRIGHT+b[5:]+RESET)
+              colored_branches.append(MAGENTA_BRIGHT + b[5:] + reset)
             else:
-              colored_branches.append(RED+b)
-            branches_str = '(%s) ' % ((GREEN+", ").join(colored_branches)+GREEN)
+              colored_branches.append(RED + b)
+          if colored_branches:
+            branches_str = '(' + GREEN_SEP.join(colored_branches) + green + ') '
           line = "%s%s%s" % (line[:start-1], branches_str, line[end+5:])
           if head_marker:
             line = line.replace('*', head_marker, 1)
-      sys.stdout.write(line)
+      buf += line
+      if len(buf) >= chunk_size:
+        write(buf)
+        del buf[:]
   except (IOError, KeyboardInterrupt):
     pass
   finally:
+    try:
+      write(buf)
+    except IOError:
+      pass
     sys.stderr.close()
     sys.stdout.close()
   return 0
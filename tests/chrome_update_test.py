@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# Copyright 2014 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+"""Unit tests for chrome-update.py."""
+
+import imp
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import urllib2
+
+DEPOT_TOOLS_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DEPOT_TOOLS_ROOT)
+
+from testing_support import auto_stub
+
+chrome_update = imp.load_source(
+    'chrome_update', os.path.join(DEPOT_TOOLS_ROOT, 'chrome-update.py'))
+
+
+URL = 'http://example.com/compile.py'
+
+
+class FakeResponse(object):
+  def __init__(self, data, headers=None):
+    self.data = data
+    self.headers = headers or {}
+
+  def read(self):
+    return self.data
+
+  def info(self):
+    return self
+
+  def getheader(self, name):
+    return self.headers.get(name)
+
+
+class FakeThread(object):
+  """Runs its target synchronously on start()."""
+  started = []
+
+  def __init__(self, target, args):
+    self.target = target
+    self.args = args
+    self.daemon = False
+
+  def start(self):
+    FakeThread.started.append(self)
+    self.target(*self.args)
+
+
+class CacheTest(auto_stub.TestCase):
+  def setUp(self):
+    super(CacheTest, self).setUp()
+    self.root = tempfile.mkdtemp()
+    self.filename = os.path.join(self.root, 'compile.py')
+    self.cache = chrome_update.Cache()
+    self.requests = []
+    self.responses = []
+    self.age = None
+    FakeThread.started = []
+    self.mock(chrome_update.urllib2, 'urlopen', self._urlopen)
+    self.mock(chrome_update.threading, 'Thread', FakeThread)
+    self.mock(chrome_update.os.path, 'getmtime', self._getmtime)
+
+  def tearDown(self):
+    shutil.rmtree(self.root)
+    super(CacheTest, self).tearDown()
+
+  def _urlopen(self, request, timeout=None):
+    self.assertEqual(chrome_update.FETCH_TIMEOUT, timeout)
+    self.requests.append(request)
+    response = self.responses.pop(0)
+    if isinstance(response, Exception):
+      raise response
+    return response
+
+  def _getmtime(self, path):
+    if self.age is None:
+      raise OSError(path)
+    return time.time() - self.age
+
+  def write_cached(self, data, age, meta=None):
+    with open(self.filename, 'w') as f:
+      f.write(data)
+    with open(self.filename + '.meta.json', 'w') as f:
+      json.dump(meta or {'etag': '"v1"', 'last_modified': None}, f)
+    self.age = age
+
+  def read_cached(self):
+    with open(self.filename) as f:
+      return f.read()
+
+  def get(self, **kwargs):
+    return self.cache.get(URL, self.filename, 100, 1000, **kwargs)
+
+  def test_fresh(self):
+    self.write_cached('old', 10)
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual([], self.requests)
+
+  def test_stale_while_revalidate(self):
+    self.write_cached('old', 500)
+    self.responses.append(FakeResponse('new', {'ETag': '"v2"'}))
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual(1, len(FakeThread.started))
+    self.assertTrue(FakeThread.started[0].daemon)
+    self.assertEqual('"v1"', self.requests[0].get_header('If-none-match'))
+    self.assertEqual('new', self.read_cached())
+
+  def test_stale_while_revalidate_error(self):
+    self.write_cached('old', 500)
+    self.responses.append(urllib2.URLError('offline'))
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual('old', self.read_cached())
+
+  def test_deferred(self):
+    self.write_cached('old', 500)
+    self.responses.append(FakeResponse('new'))
+    self.assertEqual(self.filename, self.get(background=False))
+    self.assertEqual([], self.requests)
+    self.assertEqual('old', self.read_cached())
+    self.cache.revalidate_deferred()
+    self.assertEqual('new', self.read_cached())
+
+  def test_missing(self):
+    self.responses.append(FakeResponse(
+        'new', {'ETag': '"v2"', 'Last-Modified': 'Mon, 01 Dec 2014'}))
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual(None, self.requests[0].get_header('If-none-match'))
+    self.assertEqual('new', self.read_cached())
+    with open(self.filename + '.meta.json') as f:
+      self.assertEqual({'etag': '"v2"', 'last_modified': 'Mon, 01 Dec 2014'},
+                       json.load(f))
+
+  def test_expired_not_modified(self):
+    self.write_cached('old', 5000)
+    self.responses.append(urllib2.HTTPError(URL, 304, 'Not Modified', {}, None))
+    self.mock(chrome_update.os, 'utime', lambda *args: self.requests.append(
+        'utime'))
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual('utime', self.requests[-1])
+    self.assertEqual('old', self.read_cached())
+
+  def test_expired_offline(self):
+    self.write_cached('old', 5000)
+    self.responses.append(urllib2.URLError('offline'))
+    self.assertEqual(self.filename, self.get())
+    self.assertEqual('old', self.read_cached())
+
+  def test_missing_offline(self):
+    self.responses.append(urllib2.URLError('offline'))
+    self.assertRaises(urllib2.URLError, self.get)
+
+  def test_latest_revision(self):
+    self.mock(chrome_update, 'CACHE_DIR', self.root)
+    self.mock(chrome_update, 'CACHE', self.cache)
+    self.responses.append(FakeResponse('Revision: 1234\n'))
+    self.assertEqual(1234, chrome_update.GetLastestRevision())
+
+  def test_latest_revision_http_error(self):
+    self.mock(chrome_update, 'CACHE_DIR', self.root)
+    self.mock(chrome_update, 'CACHE', self.cache)
+    self.responses.append(urllib2.HTTPError(URL, 404, 'Not Found', {}, None))
+    self.assertEqual(None, chrome_update.GetLastestRevision())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# Copyright 2014 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+"""Unit tests for git_map.py"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+DEPOT_TOOLS_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DEPOT_TOOLS_ROOT)
+
+from testing_support import git_test_utils
+
+
+class GitMapTest(git_test_utils.GitRepoReadWriteTestBase):
+  REPO_SCHEMA = """
+  A B C D
+    B E
+  """
+
+  def setUp(self):
+    super(GitMapTest, self).setUp()
+    self.repo.git('config', 'depot-tools.upstream', 'branch_D')
+
+  def git_map(self):
+    """Runs git_map.py in the repo, returning (retcode, stdout, stderr).
+
+    git_map.main() closes sys.stdout, so it is run in a subprocess.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(DEPOT_TOOLS_ROOT, 'git_map.py')],
+        cwd=self.repo.repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+  def testMergeBaseMarker(self):
+    self.repo.git('branch', '--set-upstream-to', 'branch_D', 'branch_E')
+    retcode, out, _ = self.git_map()
+    self.assertEqual(0, retcode)
+    self.assertIn('<(branch_E)', out)
+
+  def testDeletedUpstream(self):
+    self.repo.git('branch', 'up', 'branch_D')
+    self.repo.git('branch', '--set-upstream-to', 'up', 'branch_E')
+    self.repo.git('branch', '-D', 'up')
+    retcode, out, err = self.git_map()
+    self.assertEqual(0, retcode, err)
+    self.assertNotIn('<(', out)
+    self.assertIn('branch_E', out)
+
+  def testTooManyBranches(self):
+    self.repo.git('config', 'depot-tools.branch-limit', '1')
+    retcode, _, err = self.git_map()
+    self.assertEqual(1, retcode)
+    self.assertIn('too many branches', err)
+
+
+if __name__ == '__main__':
+  unittest.main()
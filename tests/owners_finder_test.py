@@ -37,30 +37,34 @@ def owners_file(*email_addresses, **kwargs):
   return s + '\n'.join(email_addresses) + '\n'
 
 
+# Built once at import; test_repo() hands each test its own shallow copy.
+_FILES = {
+  '/DEPS': '',
+  '/OWNERS': owners_file(ken, peter, tom),
+  '/base/vlog.h': '',
+  '/chrome/OWNERS': owners_file(ben, brett),
+  '/chrome/browser/OWNERS': owners_file(brett),
+  '/chrome/browser/defaults.h': '',
+  '/chrome/gpu/OWNERS': owners_file(ken),
+  '/chrome/gpu/gpu_channel.h': '',
+  '/chrome/renderer/OWNERS': owners_file(peter),
+  '/chrome/renderer/gpu/gpu_channel_host.h': '',
+  '/chrome/renderer/safe_browsing/scorer.h': '',
+  '/content/OWNERS': owners_file(john, darin, comment='foo', noparent=True),
+  '/content/content.gyp': '',
+  '/content/bar/foo.cc': '',
+  '/content/baz/OWNERS': owners_file(brett),
+  '/content/baz/froboz.h': '',
+  '/content/baz/ugly.cc': '',
+  '/content/baz/ugly.h': '',
+  '/content/views/OWNERS': owners_file(ben, john, owners.EVERYONE,
+                                       noparent=True),
+  '/content/views/pie.h': '',
+}
+
+
 def test_repo():
-  return filesystem_mock.MockFileSystem(files={
-    '/DEPS': '',
-    '/OWNERS': owners_file(ken, peter, tom),
-    '/base/vlog.h': '',
-    '/chrome/OWNERS': owners_file(ben, brett),
-    '/chrome/browser/OWNERS': owners_file(brett),
-    '/chrome/browser/defaults.h': '',
-    '/chrome/gpu/OWNERS': owners_file(ken),
-    '/chrome/gpu/gpu_channel.h': '',
-    '/chrome/renderer/OWNERS': owners_file(peter),
-    '/chrome/renderer/gpu/gpu_channel_host.h': '',
-    '/chrome/renderer/safe_browsing/scorer.h': '',
-    '/content/OWNERS': owners_file(john, darin, comment='foo', noparent=True),
-    '/content/content.gyp': '',
-    '/content/bar/foo.cc': '',
-    '/content/baz/OWNERS': owners_file(brett),
-    '/content/baz/froboz.h': '',
-    '/content/baz/ugly.cc': '',
-    '/content/baz/ugly.h': '',
-    '/content/views/OWNERS': owners_file(ben, john, owners.EVERYONE,
-                                         noparent=True),
-    '/content/views/pie.h': '',
-  })
+  return filesystem_mock.MockFileSystem(files=dict(_FILES))
 
 
 class OutputInterceptedOwnersFinder(owners_finder.OwnersFinder):
@@ -42,6 +42,40 @@ TYPE = 'type'
 USER_BY_EMAIL = 'UserByEmail'
 USER_BY_ID = 'UserById'
 
+# Lower-cased forms of the above, used when matching SAX element names.
+_ALL_AUTHENTICATED_USERS_LC = ALL_AUTHENTICATED_USERS.lower()
+_ALL_USERS_LC = ALL_USERS.lower()
+_DISPLAY_NAME_LC = DISPLAY_NAME.lower()
+_DOMAIN_LC = DOMAIN.lower()
+_EMAIL_ADDRESS_LC = EMAIL_ADDRESS.lower()
+_ENTRY_LC = ENTRY.lower()
+_ENTRIES_LC = ENTRIES.lower()
+_GROUP_BY_DOMAIN_LC = GROUP_BY_DOMAIN.lower()
+_GROUP_BY_EMAIL_LC = GROUP_BY_EMAIL.lower()
+_GROUP_BY_ID_LC = GROUP_BY_ID.lower()
+_ID_LC = ID.lower()
+_NAME_LC = NAME.lower()
+_OWNER_LC = OWNER.lower()
+_PERMISSION_LC = PERMISSION.lower()
+_SCOPE_LC = SCOPE.lower()
+_USER_BY_EMAIL_LC = USER_BY_EMAIL.lower()
+_USER_BY_ID_LC = USER_BY_ID.lower()
+
+# Pre-formatted XML tags used by the to_xml() methods.
+_ACL_OPEN = '<%s>' % ACCESS_CONTROL_LIST
+_ACL_CLOSE = '</%s>' % ACCESS_CONTROL_LIST
+_ENTRIES_OPEN = '<%s>' % ENTRIES
+_ENTRIES_CLOSE = '</%s>' % ENTRIES
+_ENTRY_OPEN = '<%s>' % ENTRY
+_ENTRY_CLOSE = '</%s>' % ENTRY
+_SCOPE_OPEN = '<%s type="%%s">' % SCOPE
+_SCOPE_CLOSE = '</%s>' % SCOPE
+_DOMAIN_XML = '<%s>%%s</%s>' % (DOMAIN, DOMAIN)
+_EMAIL_ADDRESS_XML = '<%s>%%s</%s>' % (EMAIL_ADDRESS, EMAIL_ADDRESS)
+_ID_XML = '<%s>%%s</%s>' % (ID, ID)
+_NAME_XML = '<%s>%%s</%s>' % (NAME, NAME)
+_PERMISSION_XML = '<%s>%%s</%s>' % (PERMISSION, PERMISSION)
+
 
 CannedACLStrings = ['private', 'public-read', 'project-private',
                     'public-read-write', 'authenticated-read',
@@ -55,7 +89,8 @@ class ACL:
 
     def __init__(self, parent=None):
         self.parent = parent
-        self.entries = []
+        self.owner = None
+        self.entries = Entries(self)
 
     @property
     def acl(self):
@@ -63,14 +98,12 @@ class ACL:
 
     def __repr__(self):
         # Owner is optional in GS ACLs.
-        if hasattr(self, 'owner'):
+        if self.owner is not None:
             entries_repr = ['Owner:%s' % self.owner.__repr__()]
         else:
             entries_repr = ['']
-        acl_entries = self.entries
-        if acl_entries:
-            for e in acl_entries.entry_list:
-                entries_repr.append(e.__repr__())
+        for e in self.entries.entry_list:
+            entries_repr.append(e.__repr__())
         return '<%s>' % ', '.join(entries_repr)
 
     # Method with same signature as boto.s3.acl.ACL.add_email_grant(), to allow
@@ -96,33 +129,28 @@ class ACL:
         self.entries.entry_list.append(entry)
 
     def startElement(self, name, attrs, connection):
-        if name.lower() == OWNER.lower():
+        lname = name.lower()
+        if lname == _OWNER_LC:
             self.owner = User(self)
             return self.owner
-        elif name.lower() == ENTRIES.lower():
+        elif lname == _ENTRIES_LC:
             self.entries = Entries(self)
             return self.entries
         else:
             return None
 
     def endElement(self, name, value, connection):
-        if name.lower() == OWNER.lower():
-            pass
-        elif name.lower() == ENTRIES.lower():
-            pass
-        else:
+        if name.lower() not in (_OWNER_LC, _ENTRIES_LC):
             setattr(self, name, value)
 
     def to_xml(self):
-        s = '<%s>' % ACCESS_CONTROL_LIST
+        parts = [_ACL_OPEN]
         # Owner is optional in GS ACLs.
-        if hasattr(self, 'owner'):
-            s += self.owner.to_xml()
-        acl_entries = self.entries
-        if acl_entries:
-            s += acl_entries.to_xml()
-        s += '</%s>' % ACCESS_CONTROL_LIST
-        return s
+        if self.owner is not None:
+            parts.append(self.owner.to_xml())
+        parts.append(self.entries.to_xml())
+        parts.append(_ACL_CLOSE)
+        return ''.join(parts)
 
 
 class Entries:
@@ -140,7 +168,7 @@ class Entries:
         return '<Entries: %s>' % ', '.join(entries_repr)
 
     def startElement(self, name, attrs, connection):
-        if name.lower() == ENTRY.lower():
+        if name.lower() == _ENTRY_LC:
             entry = Entry(self)
             self.entry_list.append(entry)
             return entry
@@ -148,17 +176,14 @@ class Entries:
             return None
 
     def endElement(self, name, value, connection):
-        if name.lower() == ENTRY.lower():
-            pass
-        else:
+        if name.lower() != _ENTRY_LC:
             setattr(self, name, value)
 
     def to_xml(self):
-        s = '<%s>' % ENTRIES
-        for entry in self.entry_list:
-            s += entry.to_xml()
-        s += '</%s>' % ENTRIES
-        return s
+        parts = [_ENTRIES_OPEN]
+        parts.extend(entry.to_xml() for entry in self.entry_list)
+        parts.append(_ENTRIES_CLOSE)
+        return ''.join(parts)
         
 
 # Class that represents a single (Scope, Permission) entry in an ACL.
@@ -175,7 +200,8 @@ class Entry:
         return '<%s: %s>' % (self.scope.__repr__(), self.permission.__repr__())
 
     def startElement(self, name, attrs, connection):
-        if name.lower() == SCOPE.lower():
+        lname = name.lower()
+        if lname == _SCOPE_LC:
             # The following if statement used to look like this: 
             #   if not TYPE in attrs:
             # which caused problems because older versions of the 
@@ -196,42 +222,58 @@ class Entry:
                                       (TYPE, SCOPE))
             self.scope = Scope(self, attrs[TYPE])
             return self.scope
-        elif name.lower() == PERMISSION.lower():
+        elif lname == _PERMISSION_LC:
             pass
         else:
             return None
 
+    def _end_scope(self, value):
+        pass
+
+    def _end_permission(self, value):
+        value = value.strip()
+        if not value in SupportedPermissions:
+            raise InvalidAclError('Invalid Permission "%s"' % value)
+        self.permission = value
+
+    # Map from lower-cased element name to its endElement handler.
+    _END_HANDLERS = {
+        _SCOPE_LC: _end_scope,
+        _PERMISSION_LC: _end_permission,
+    }
+
     def endElement(self, name, value, connection):
-        if name.lower() == SCOPE.lower():
-            pass
-        elif name.lower() == PERMISSION.lower():
-            value = value.strip()
-            if not value in SupportedPermissions:
-                raise InvalidAclError('Invalid Permission "%s"' % value)
-            self.permission = value
+        handler = self._END_HANDLERS.get(name.lower())
+        if handler:
+            handler(self, value)
         else:
             setattr(self, name, value)
 
     def to_xml(self):
-        s = '<%s>' % ENTRY
-        s += self.scope.to_xml()
-        s += '<%s>%s</%s>' % (PERMISSION, self.permission, PERMISSION)
-        s += '</%s>' % ENTRY
-        return s
+        return ''.join((_ENTRY_OPEN, self.scope.to_xml(),
+                        _PERMISSION_XML % self.permission, _ENTRY_CLOSE))
 
 class Scope:
 
-    # Map from Scope type.lower() to lower-cased list of allowed sub-elems.
+    # Map from Scope type.lower() to lower-cased set of allowed sub-elems.
     ALLOWED_SCOPE_TYPE_SUB_ELEMS = {
-        ALL_AUTHENTICATED_USERS.lower() : [],
-        ALL_USERS.lower() : [],
-        GROUP_BY_DOMAIN.lower() : [DOMAIN.lower()],
-        GROUP_BY_EMAIL.lower() : [
-            DISPLAY_NAME.lower(), EMAIL_ADDRESS.lower(), NAME.lower()],
-        GROUP_BY_ID.lower() : [DISPLAY_NAME.lower(), ID.lower(), NAME.lower()],
-        USER_BY_EMAIL.lower() : [
-            DISPLAY_NAME.lower(), EMAIL_ADDRESS.lower(), NAME.lower()],
-        USER_BY_ID.lower() : [DISPLAY_NAME.lower(), ID.lower(), NAME.lower()]
+        _ALL_AUTHENTICATED_USERS_LC : frozenset(),
+        _ALL_USERS_LC : frozenset(),
+        _GROUP_BY_DOMAIN_LC : frozenset([_DOMAIN_LC]),
+        _GROUP_BY_EMAIL_LC : frozenset([
+            _DISPLAY_NAME_LC, _EMAIL_ADDRESS_LC, _NAME_LC]),
+        _GROUP_BY_ID_LC : frozenset([_DISPLAY_NAME_LC, _ID_LC, _NAME_LC]),
+        _USER_BY_EMAIL_LC : frozenset([
+            _DISPLAY_NAME_LC, _EMAIL_ADDRESS_LC, _NAME_LC]),
+        _USER_BY_ID_LC : frozenset([_DISPLAY_NAME_LC, _ID_LC, _NAME_LC])
+    }
+
+    # Map from lower-cased sub-element name to the attribute it sets.
+    _END_ATTRS = {
+        _DOMAIN_LC: 'domain',
+        _EMAIL_ADDRESS_LC: 'email_address',
+        _ID_LC: 'id',
+        _NAME_LC: 'name',
     }
 
     def __init__(self, parent, type=None, id=None, name=None,
@@ -242,9 +284,11 @@ class Scope:
         self.id = id
         self.domain = domain
         self.email_address = email_address
-        if self.type.lower() not in self.ALLOWED_SCOPE_TYPE_SUB_ELEMS:
+        self._type_lc = self.type.lower()
+        if self._type_lc not in self.ALLOWED_SCOPE_TYPE_SUB_ELEMS:
             raise InvalidAclError('Invalid %s %s "%s" ' %
                                   (SCOPE, TYPE, self.type))
+        self._allowed = self.ALLOWED_SCOPE_TYPE_SUB_ELEMS[self._type_lc]
 
     def __repr__(self):
         named_entity = None
@@ -260,45 +304,32 @@ class Scope:
             return '<%s>' % self.type
 
     def startElement(self, name, attrs, connection):
-        if (not name.lower() in
-            self.ALLOWED_SCOPE_TYPE_SUB_ELEMS[self.type.lower()]):
+        if name.lower() not in self._allowed:
             raise InvalidAclError('Element "%s" not allowed in %s %s "%s" ' %
                                    (name, SCOPE, TYPE, self.type))
         return None
 
     def endElement(self, name, value, connection):
         value = value.strip()
-        if name.lower() == DOMAIN.lower():
-            self.domain = value
-        elif name.lower() == EMAIL_ADDRESS.lower():
-            self.email_address = value
-        elif name.lower() == ID.lower():
-            self.id = value
-        elif name.lower() == NAME.lower():
-            self.name = value
-        else:
-            setattr(self, name, value)
+        setattr(self, self._END_ATTRS.get(name.lower(), name), value)
 
     def to_xml(self):
-        s = '<%s type="%s">' % (SCOPE, self.type)
-        if (self.type.lower() == ALL_AUTHENTICATED_USERS.lower()
-            or self.type.lower() == ALL_USERS.lower()):
+        parts = [_SCOPE_OPEN % self.type]
+        type_lc = self._type_lc
+        if type_lc in (_ALL_AUTHENTICATED_USERS_LC, _ALL_USERS_LC):
             pass
-        elif self.type.lower() == GROUP_BY_DOMAIN.lower():
-            s += '<%s>%s</%s>' % (DOMAIN, self.domain, DOMAIN)
-        elif (self.type.lower() == GROUP_BY_EMAIL.lower()
-              or self.type.lower() == USER_BY_EMAIL.lower()):
-            s += '<%s>%s</%s>' % (EMAIL_ADDRESS, self.email_address,
-                                  EMAIL_ADDRESS)
+        elif type_lc == _GROUP_BY_DOMAIN_LC:
+            parts.append(_DOMAIN_XML % self.domain)
+        elif type_lc in (_GROUP_BY_EMAIL_LC, _USER_BY_EMAIL_LC):
+            parts.append(_EMAIL_ADDRESS_XML % self.email_address)
             if self.name:
-              s += '<%s>%s</%s>' % (NAME, self.name, NAME)
-        elif (self.type.lower() == GROUP_BY_ID.lower()
-              or self.type.lower() == USER_BY_ID.lower()):
-            s += '<%s>%s</%s>' % (ID, self.id, ID)
+              parts.append(_NAME_XML % self.name)
+        elif type_lc in (_GROUP_BY_ID_LC, _USER_BY_ID_LC):
+            parts.append(_ID_XML % self.id)
             if self.name:
-              s += '<%s>%s</%s>' % (NAME, self.name, NAME)
+              parts.append(_NAME_XML % self.name)
         else:
             raise InvalidAclError('Invalid scope type "%s" ', self.type)
 
-        s += '</%s>' % SCOPE
-        return s
+        parts.append(_SCOPE_CLOSE)
+        return ''.join(parts)